@@ -1,33 +1,179 @@
-import requests
+import atexit
 import time
 import json
+import hashlib
+import functools
 import typer
 import sys
+import threading
 import csv  # Added import
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, NamedTuple, Tuple
 from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress
+
+# Prefer orjson's Rust parser/serializer; fall back to the stdlib when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Initialize Rich Console
 console = Console()
 
+# Shared HTTP session so every call reuses pooled keep-alive connections
+# instead of paying a fresh TCP + TLS handshake per request. It is built on
+# first use so the menu and argument errors don't pay for importing requests.
+REQUEST_TIMEOUT = (3.05, 30)  # (connect, read) in seconds
+CACHE_NAME = "stripe_checker_cache"
+CACHE_EXPIRE_SECONDS = 300
+POOL_MAXSIZE = 128  # Keep-alive connections kept per host
+
+_SESSION = None
+_USE_CACHE = True
+
+# Stdlib fallbacks, built once; Stripe payloads are plain trees so the circular-reference check is skipped
+_encode_pretty = json.JSONEncoder(indent=2, ensure_ascii=False, check_circular=False).encode
+_encode_compact = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, check_circular=False).encode
+
+def _loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _dumps_pretty(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return _encode_pretty(obj)
+
+def _dumps_compact(obj):
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return _encode_compact(obj)
+
+def _cache_key(request, **kwargs):
+    # requests-cache leaves Authorization out of its keys by default; fold a digest of it
+    # back in so a response fetched with one API key is never served for another.
+    from requests_cache import create_key
+
+    key = create_key(request, **kwargs)
+    auth = request.headers.get("Authorization", "")
+    return hashlib.blake2b(f"{key}:{auth}".encode(), digest_size=16).hexdigest()
+
+def _make_session(use_cache=True, retry_rate_limited=True):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Optional on-disk cache for idempotent GETs (pip install requests-cache)
+    CachedSession = None
+    if use_cache:
+        try:
+            from requests_cache import CachedSession
+        except ImportError:
+            pass
+
+    if CachedSession is not None:
+        # Only GETs are cached; token creation (POST) always goes to the network.
+        session = CachedSession(
+            CACHE_NAME,
+            backend="sqlite",
+            expire_after=CACHE_EXPIRE_SECONDS,
+            allowable_methods=("GET",),
+            cache_control=True,
+            key_fn=_cache_key,
+        )
+    else:
+        session = requests.Session()
+    # Callers with their own rate limiter handle 429s themselves rather than letting
+    # the adapter re-send them outside of it.
+    retry_statuses = [500, 502, 503, 504]
+    if retry_rate_limited:
+        retry_statuses.append(429)
+    # urllib3's default allowed_methods only retries idempotent verbs, so POST /v1/tokens
+    # (which creates a new token each time) is never re-sent.
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=retry_statuses,
+            raise_on_status=False,  # Hand the final response back so callers can report it
+        ),
+    )
+    # Custom endpoints may be plain HTTP; give them the same keep-alive pool and retries.
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "stripe-checker/1.0"})
+    atexit.register(session.close)
+    return session
+
+def _get_session():
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _make_session(_USE_CACHE)
+    return _SESSION
+
+# Default concurrent in-flight probes during brute-force (at most POOL_MAXSIZE)
+BRUTE_FORCE_WORKERS = 32
+DEFAULT_RPS = 2  # Matches the old 500ms default delay
+RATE_LIMIT_ATTEMPTS = 3  # Attempts per probe while Stripe answers 429
+
+# Preformatted customer ID / lookup URL templates for the brute-force loop
+_CUSTOMER_ID = "cus_%010d".__mod__
+_CUSTOMER_URL = "https://api.stripe.com/v1/customers/cus_%010d".__mod__
+
+# Token-bucket rate limiter shared by the brute-force workers
+class Throttler:
+    def __init__(self, rps):
+        self.rate = rps
+        self.capacity = max(1.0, rps)
+        self.tokens = self.capacity
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+                self.ts = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                sleep_for = (1 - self.tokens) / self.rate
+            time.sleep(sleep_for)
+
+    def pause(self, seconds):
+        # Push the bucket into debt so every worker sits out the server's Retry-After.
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+def _retry_after(response, default=1.0):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except ValueError:
+        return default
+
 # Simplified Header
 def display_header():
     console.print("Stripe Checker: A Tool for Auditing and Validating Stripe API Keys", style="bold cyan")
     console.print("=" * 70, style="cyan")
 
 # Menu Options with Integrated Help Content
-def display_menu():
-    menu = """
+MENU_TEXT = """
 [bold green]Available Modes and Features:[/bold green]
 
 [bold cyan]1.[/bold cyan] [bold yellow]default[/bold yellow]     - Validate the secret key by listing charges.
                           Usage: -m default --secretkey <SECRET_KEY>
 
 [bold cyan]2.[/bold cyan] [bold yellow]brute-force[/bold yellow] - Discover customers by brute-forcing customer IDs.
-                          Usage: -m brute-force --secretkey <SECRET_KEY> --start <START_ID> --stop <STOP_ID> [--delay <DELAY_MS>]
+                          Usage: -m brute-force --secretkey <SECRET_KEY> --start <START_ID> --stop <STOP_ID> [--rps <REQUESTS_PER_SECOND>]
 
 [bold cyan]3.[/bold cyan] [bold yellow]pubkey[/bold yellow]      - Validate the publishable key by creating tokens.
                           Usage: -m pubkey --pubkey <PUBLISHABLE_KEY>
@@ -52,15 +198,20 @@ Options:
   --pubkey TEXT              Stripe publishable key (pk_test_xxx)
   --start INTEGER            Start of customer ID range (used with brute-force mode)
   --stop INTEGER             End of customer ID range (used with brute-force mode)
-  --delay INTEGER            Time delay between requests in milliseconds (default: 500ms)
+  --rps FLOAT                Maximum brute-force requests per second (default: 2, 0 disables throttling)
+  --delay INTEGER            Deprecated: time delay between requests in milliseconds (use --rps)
+  --workers INTEGER          Concurrent brute-force requests in flight (default: 32, max: 128)
   --custom-endpoint TEXT     Custom endpoint to test (used with custom mode)
   --output-folder TEXT       Folder to save results (default: output)
+  --no-cache                 Bypass response caching (on-disk GET cache and in-process memo)
   --help                     Show this message and exit.
 
 [bold green]Additional Features:[/bold green]
---delay         - Set the delay (in ms) between requests during brute-force (default: 500ms).
+--rps           - Cap the brute-force request rate in requests per second (default: 2). Replaces the deprecated --delay.
+--workers       - Number of brute-force requests kept in flight at once (default: 32).
 --start/--stop  - Define the range for brute-forcing customer IDs (required for brute-force mode).
 --output-folder - Specify the folder to save results (default: ./output).
+--no-cache      - Always query the network instead of reusing cached GET responses (requires requests-cache).
 
 [bold green]Usage Tips:[/bold green]
 • Ensure you have the correct API keys (secret and/or publishable) before running tests.
@@ -87,7 +238,7 @@ Options:
   `python stripeChecker.py -m default --secretkey sk_test_xxx`
 
 • Discover customers with brute-force:
-  `python stripeChecker.py -m brute-force --secretkey sk_test_xxx --start 1 --stop 100 --delay 200`
+  `python stripeChecker.py -m brute-force --secretkey sk_test_xxx --start 1 --stop 100 --rps 5`
 
 • Validate a publishable key:
   `python stripeChecker.py -m pubkey --pubkey pk_test_xxx`
@@ -101,126 +252,247 @@ Options:
 [bold green]Help Content Continued:[/bold green]
 For detailed information on each option and mode, refer to the official [Stripe API Documentation](https://stripe.com/docs/api) or use the `--help` flag with any command.
 """
-    console.print(menu)
-
-# Function to Save Results to a File
-def save_results_to_file(results, output_folder):
-    # Create output folder if it doesn't exist
-    Path(output_folder).mkdir(parents=True, exist_ok=True)
+_MENU = None  # Parsed once, then reused
 
-    # Generate timestamped filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = Path(output_folder) / f"stripe_test_results_{timestamp}.csv"  # Changed to CSV
-
-    # Prepare data for CSV
-    csv_data = []
+def display_menu():
+    global _MENU
+    if _MENU is None:
+        from rich.text import Text
+        _MENU = Text.from_markup(MENU_TEXT)
+    console.print(_MENU)
+
+# Flatten results into (Test, Result, Status) rows for the CSV file and the table
+def _iter_rows(results, pretty=True):
+    dumps = _dumps_pretty if pretty else _dumps_compact
     for test, data in results.items():
         if isinstance(data, dict):
-            status = "PASS" if data.get("status") else f"FAIL ({data.get('error', data.get('raw_response', 'Unknown Error'))})"
-            if "raw_response" in data:
-                # Pretty-print JSON for better readability
-                if isinstance(data["raw_response"], (dict, list)):
-                    result_str = json.dumps(data["raw_response"], indent=2)
-                else:
-                    result_str = str(data["raw_response"])
-                csv_data.append({"Test": test, "Result": result_str, "Status": status})
-            elif "found_customers" in data:
-                for customer in data["found_customers"]:
-                    customer_info = f"{customer['id']} ({customer.get('email', 'No Email')})"
-                    customer_status = "PASS" if customer.get("id") else "FAIL"
-                    csv_data.append({"Test": "Found Customer", "Result": customer_info, "Status": customer_status})
+            if data.get("status"):
+                status = "PASS"
             else:
-                csv_data.append({"Test": test, "Result": "-", "Status": status})
-        else:
-            # For simple boolean or string results
-            status = "PASS" if data is True else f"FAIL ({data})"
-            csv_data.append({"Test": test, "Result": "-", "Status": status})
-
-    # Save results to CSV file
-    with open(output_file, "w", newline="", encoding="utf-8") as file:
-        writer = csv.DictWriter(file, fieldnames=["Test", "Result", "Status"])
-        writer.writeheader()
-        writer.writerows(csv_data)
-
-    console.print(f"\n[bold green]Results saved to {output_file}[/bold green]")
-
-# Function to Display Results
-def display_results(results):
-    """Display test results in a table with three columns: Test, Result, Status."""
-    table = Table(title="Test Results")
-    table.add_column("Test", justify="left", style="cyan", no_wrap=True)
-    table.add_column("Result", justify="left", style="green")
-    table.add_column("Status", justify="center", style="magenta")  # Added Status column
-
-    for test, data in results.items():
-        if isinstance(data, dict):
+                err = data.get("error") or data.get("raw_response") or "Unknown Error"
+                status = f"FAIL ({err})"
             if "raw_response" in data:
-                status = "PASS" if data.get("status") else "FAIL"
-                # Convert raw_response to a JSON string for better readability
-                raw_response = data.get("raw_response", "-")
-                raw_response_str = json.dumps(raw_response, indent=2) if isinstance(raw_response, (dict, list)) else str(raw_response)
-                table.add_row(test, raw_response_str, status)
+                raw_response = data["raw_response"]
+                # Indented JSON for people, compact JSON for files
+                result_str = dumps(raw_response) if isinstance(raw_response, (dict, list)) else str(raw_response)
+                yield (test, result_str, status)
             elif "found_customers" in data:
                 for customer in data["found_customers"]:
                     customer_info = f"{customer['id']} ({customer.get('email', 'No Email')})"
                     customer_status = "PASS" if customer.get("id") else "FAIL"
-                    table.add_row("Found Customer", customer_info, customer_status)
+                    yield ("Found Customer", customer_info, customer_status)
+                # Always close with a summary so an empty run still shows up
+                summary = f"{len(data['found_customers'])} found in {data.get('checked', '?')} IDs"
+                yield (test, summary, status)
             else:
-                status = "PASS" if data.get("status") else f"FAIL ({data.get('error', 'Unknown Error')})"
-                table.add_row(test, "-", status)
+                yield (test, "-", status)
         else:
             # For simple boolean or string results
             status = "PASS" if data is True else f"FAIL ({data})"
-            table.add_row(test, "-", status)
-
-    console.print(table)
-
-# Example Function Definitions (Replace these with actual implementations)
-def brute_force_customers(secret_key, delay, start, stop):
-    # Placeholder implementation
-    time.sleep(delay / 1000)  # Convert ms to seconds
-    # Simulate found customers
-    return {
-        "found_customers": [
-            {"id": f"cus_{start:010}", "email": "customer1@example.com"},
-            {"id": f"cus_{stop:010}", "email": None}  # Example with no email
-        ]
-    }
+            yield (test, "-", status)
+
+# Create the output folder once per path and hand back its Path
+@functools.lru_cache(maxsize=4)
+def _ensure_outdir(output_folder):
+    path = Path(output_folder)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+# Keep each plain-text result on one line with tab-separated fields intact
+_PLAIN_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+# Stream each result to the CSV file and a live console table as soon as it is recorded
+class ResultStream:
+    def __init__(self, output_folder, timestamp):
+        self.output_folder = output_folder
+        self.timestamp = timestamp
+        self.output_file = None
+        self.file = None
+        self.writer = None
+        self.table = None
+        self.live = None
+
+    def __enter__(self):
+        return self
+
+    def _start(self):
+        # Timestamped filename in the (created on demand) output folder
+        self.output_file = _ensure_outdir(self.output_folder) / f"stripe_test_results_{self.timestamp}.csv"  # Changed to CSV
+        self.file = open(self.output_file, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(("Test", "Result", "Status"))
+
+        # Piped or redirected output gets plain tab-separated rows instead of a table
+        if not console.is_terminal:
+            return
+
+        from rich.live import Live
+        from rich.table import Table
+
+        # Test results table with three columns: Test, Result, Status
+        self.table = Table(title="Test Results")
+        self.table.add_column("Test", justify="left", style="cyan", no_wrap=True)
+        self.table.add_column("Result", justify="left", style="green")
+        self.table.add_column("Status", justify="center", style="magenta")  # Added Status column
+        self.live = Live(self.table, console=console, auto_refresh=False)
+        self.live.start()
+
+    def add(self, test, data):
+        """Append one test result to the CSV file and the console."""
+        if self.file is None:
+            self._start()
+        result = {test: data}
+        if self.live is None:
+            # Compact rows serve both the CSV file and the plain-text output
+            for row in _iter_rows(result, pretty=False):
+                self.writer.writerow(row)
+                sys.stdout.write("\t".join(field.translate(_PLAIN_ESCAPES) for field in row) + "\n")
+            self.file.flush()
+            return
+        self.writer.writerows(_iter_rows(result, pretty=False))
+        self.file.flush()
+        for row in _iter_rows(result):
+            self.table.add_row(*row)
+        self.live.refresh()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.live is not None:
+            self.live.stop()
+        if self.file is not None:
+            self.file.close()
+            console.print(f"\n[bold green]Results saved to {self.output_file}[/bold green]")
+        elif exc_type is None:
+            console.print("[bold yellow]No results to save. Ensure the mode executed properly.[/bold yellow]")
+            console.print("[bold yellow]No results to display.[/bold yellow]")
+        return False
+
+# Function to Brute-Force Customer IDs
+def brute_force_customers(secret_key, rps, start, stop, workers=BRUTE_FORCE_WORKERS):
+    # Probes run concurrently so Stripe-side latencies overlap; the shared token bucket
+    # keeps the aggregate rate at `rps` (no throttling at all when rps is 0).
+    from requests import RequestException
+
+    # A dedicated, uncached session: its adapter leaves 429s to the token bucket below,
+    # and customer records are never written to the on-disk response cache.
+    session = _make_session(use_cache=False, retry_rate_limited=False)
+    headers = _auth_headers(secret_key)
+    throttler = Throttler(rps) if rps > 0 else None
+
+    # Each probe reports (outcome, payload): "found", "missing", "denied" or "error"
+    def probe(url):
+        for _ in range(RATE_LIMIT_ATTEMPTS):
+            if throttler:
+                throttler.acquire()
+            try:
+                response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            except RequestException:
+                return "error", "transport error"
+            except Exception as e:
+                # e.g. a requests-cache backend failure; one bad probe shouldn't end the run
+                return "error", f"probe failed ({type(e).__name__})"
+            if response.status_code != 429:
+                break
+            if throttler:
+                throttler.pause(_retry_after(response))
+            else:
+                time.sleep(_retry_after(response))
+        if response.status_code == 429:
+            return "error", f"rate-limited after {RATE_LIMIT_ATTEMPTS} attempts"
+        if response.status_code == 200:
+            try:
+                return "found", _loads(response.content)
+            except ValueError:
+                # Proxies, captive portals and truncated bodies answer 200 with non-JSON
+                return "error", "invalid JSON body"
+        if response.status_code == 404:
+            return "missing", None
+        if response.status_code in (401, 403):
+            err = _stripe_result(response)["error"]
+            message = err.get("message", err) if isinstance(err, dict) else err
+            return "denied", f"Stripe rejected the key (HTTP {response.status_code}): {message}"
+        return "error", f"HTTP {response.status_code}"
+
+    # Keep a bounded window of probes in flight so memory doesn't grow with the range
+    # and an interrupt only waits for the probes already running.
+    urls = map(_CUSTOMER_URL, range(start, stop + 1))
+    found = []
+    errors = Counter()
+    denied = None
+    checked = 0
+    with session, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(probe, url) for url in islice(urls, workers * 2)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcome, payload = future.result()
+                    checked += 1
+                    if outcome == "found":
+                        found.append(payload)
+                    elif outcome == "denied":
+                        denied = payload
+                    elif outcome == "error":
+                        errors[payload] += 1
+                if denied:
+                    # A rejected key fails every remaining ID the same way; stop here
+                    for future in pending:
+                        future.cancel()
+                    break
+                pending.update(executor.submit(probe, url) for url in islice(urls, len(done)))
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    found.sort(key=lambda customer: customer["id"])
+
+    result = {"status": not (denied or errors), "found_customers": found, "checked": checked}
+    if denied:
+        result["error"] = denied
+    elif errors:
+        details = ", ".join(f"{count} x {reason}" for reason, count in errors.most_common())
+        result["error"] = f"{sum(errors.values())} of {checked} probes failed ({details})"
+    return result
+
+# Use Stripe's test card details
+TEST_CARD = {
+    "card[number]": "4242424242424242",
+    "card[exp_month]": "12",
+    "card[exp_year]": "2025",
+    "card[cvc]": "123",
+}
+
+# Authorization headers for one key; callers build them once per call (once per run in
+# brute-force) rather than caching them, so no long-lived cache holds the raw key.
+def _auth_headers(key):
+    return {"Authorization": f"Bearer {key}"}
+
+# Parse a Stripe response body once and shape it into a test result
+def _stripe_result(response):
+    try:
+        body = _loads(response.content)
+    except json.JSONDecodeError:
+        body = response.text
+    if response.status_code == 200:
+        return {"status": True, "raw_response": body}
+    # Stripe wraps failures as {"error": {...}}; fall back to the whole body otherwise
+    err = body.get("error", body) if isinstance(body, dict) else body
+    return {"status": False, "error": err, "raw_response": body}
 
 def test_publishable_key(pubkey):
     # Updated implementation to validate the publishable key by creating a test token
     try:
         url = "https://api.stripe.com/v1/tokens"
-        headers = {
-            "Authorization": f"Bearer {pubkey}",
-        }
-        # Use Stripe's test card details
-        data = {
-            "card[number]": "4242424242424242",
-            "card[exp_month]": "12",
-            "card[exp_year]": "2025",
-            "card[cvc]": "123",
-        }
-        response = requests.post(url, headers=headers, data=data)
-        if response.status_code == 200:
-            return {"status": True, "raw_response": response.json()}
-        else:
-            # Attempt to parse JSON error message
-            try:
-                error_message = response.json().get('error', response.text)
-            except json.JSONDecodeError:
-                error_message = response.text
-            return {"status": False, "error": error_message}
+        response = _get_session().post(url, headers=_auth_headers(pubkey), data=TEST_CARD, timeout=REQUEST_TIMEOUT)
+        return _stripe_result(response)
     except Exception as e:
         return {"status": False, "error": str(e)}
 
 def test_custom_endpoint(secret_key, endpoint):
     # Placeholder implementation
     try:
-        headers = {"Authorization": f"Bearer {secret_key}"}
-        response = requests.get(endpoint, headers=headers)
+        response = _get_session().get(endpoint, headers=_auth_headers(secret_key), timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            return {"status": True, "raw_response": response.json()}
+            return {"status": True, "raw_response": _loads(response.content)}
         else:
             return {"status": False, "raw_response": response.text}
     except Exception as e:
@@ -228,20 +500,106 @@ def test_custom_endpoint(secret_key, endpoint):
 
 # Function to Test List Charges
 def test_list_charges(secret_key):
-    headers = {"Authorization": f"Bearer {secret_key}"}
     try:
-        response = requests.get("https://api.stripe.com/v1/charges", headers=headers)
-        if response.status_code == 200:
-            return {"status": True, "raw_response": response.json()}
-        else:
-            # Attempt to parse JSON error message
-            try:
-                return {"status": False, "raw_response": response.json()}
-            except json.JSONDecodeError:
-                return {"status": False, "raw_response": response.text}
+        response = _get_session().get("https://api.stripe.com/v1/charges", headers=_auth_headers(secret_key), timeout=REQUEST_TIMEOUT)
+        return _stripe_result(response)
     except Exception as e:
         return {"status": False, "error": str(e)}
 
+# Per-process memo of list-charges results, keyed by a digest so the secret key itself is never stored
+LIST_CHARGES_TTL = 15  # seconds
+LIST_CHARGES_MEMO_SIZE = 8
+_LIST_CHARGES_MEMO = {}
+
+def cached_list_charges(secret_key):
+    if not _USE_CACHE:
+        return test_list_charges(secret_key)
+    key_hash = hashlib.blake2b(secret_key.encode(), digest_size=16).hexdigest()
+    now = time.monotonic()
+    cached = _LIST_CHARGES_MEMO.get(key_hash)
+    if cached is not None and now - cached[0] < LIST_CHARGES_TTL:
+        return cached[1]
+    result = test_list_charges(secret_key)
+    if "raw_response" not in result:
+        # Transport errors and timeouts aren't answers from Stripe; don't replay them
+        return result
+    _LIST_CHARGES_MEMO.pop(key_hash, None)
+    if len(_LIST_CHARGES_MEMO) >= LIST_CHARGES_MEMO_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        del _LIST_CHARGES_MEMO[next(iter(_LIST_CHARGES_MEMO))]
+    _LIST_CHARGES_MEMO[key_hash] = (now, result)
+    return result
+
+# Mode Handlers: each announces its test(s) and records the results on the stream
+def _run_default(args, stream):
+    console.print("Testing if the secret key can list charges...")
+    stream.add("list_charges", cached_list_charges(args.secretkey))
+
+def _run_brute_force(args, stream):
+    if args.start > args.stop:
+        console.print("[bold red]Error: --start must be less than or equal to --stop.[/bold red]")
+        raise typer.Exit()
+    if not 1 <= args.workers <= POOL_MAXSIZE:
+        console.print(f"[bold red]Error: --workers must be between 1 and {POOL_MAXSIZE}.[/bold red]")
+        raise typer.Exit()
+    if (args.rps is not None and args.rps < 0) or (args.delay is not None and args.delay < 0):
+        console.print("[bold red]Error: --rps and --delay must not be negative.[/bold red]")
+        raise typer.Exit()
+    rps = args.rps
+    if rps is None:
+        if args.delay is not None:
+            console.print("[bold yellow]Warning: --delay is deprecated; use --rps instead.[/bold yellow]")
+            rps = 1000 / args.delay if args.delay > 0 else 0
+        else:
+            rps = DEFAULT_RPS
+    pace = f"at up to {rps:g} requests/second" if rps > 0 else "without throttling"
+    console.print(f"Brute-forcing customer IDs from {_CUSTOMER_ID(args.start)} to {_CUSTOMER_ID(args.stop)} {pace}...")
+    stream.add("brute_force_results", brute_force_customers(args.secretkey, rps, args.start, args.stop, args.workers))
+
+def _run_pubkey(args, stream):
+    console.print("Testing Publishable Key by creating a test token...")
+    stream.add("test_publishable_key", test_publishable_key(args.pubkey))
+
+def _run_full(args, stream):
+    console.print("Testing full validation (secret key and publishable key)...")
+    # The two checks are independent, so overlap their network round-trips
+    _get_session()  # Build the shared session before the workers race for it
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list_charges_future = executor.submit(cached_list_charges, args.secretkey)
+        pubkey_future = executor.submit(test_publishable_key, args.pubkey)
+        stream.add("list_charges", list_charges_future.result())
+        stream.add("test_publishable_key", pubkey_future.result())
+
+def _run_restricted(args, stream):
+    console.print("Testing restricted key...")
+    stream.add("list_charges", cached_list_charges(args.secretkey))
+
+def _run_custom(args, stream):
+    console.print(f"Testing custom endpoint {args.custom_endpoint}...")
+    stream.add("test_custom_endpoint", test_custom_endpoint(args.secretkey, args.custom_endpoint))
+
+# Mode Dispatch Table: required options and handler per mode
+class ModeSpec(NamedTuple):
+    required: Tuple[str, ...]
+    handler: Callable
+
+MODES = {
+    "default": ModeSpec(("secretkey",), _run_default),
+    "brute-force": ModeSpec(("secretkey", "start", "stop"), _run_brute_force),
+    "pubkey": ModeSpec(("pubkey",), _run_pubkey),
+    "full": ModeSpec(("secretkey", "pubkey"), _run_full),
+    "restricted": ModeSpec(("secretkey",), _run_restricted),
+    "custom": ModeSpec(("secretkey", "custom_endpoint"), _run_custom),
+}
+
+def _join_options(names):
+    options = [f"--{name.replace('_', '-')}" for name in names]
+    if len(options) == 1:
+        return f"{options[0]} is"
+    if len(options) == 2:
+        return f"{options[0]} and {options[1]} are"
+    return f"{', '.join(options[:-1])}, and {options[-1]} are"
+
 # Main Function
 def main(
     mode: str = typer.Option(None, help="Testing mode (default, brute-force, pubkey, full, restricted, custom)", rich_help_panel="Modes"),
@@ -249,86 +607,40 @@ def main(
     pubkey: str = typer.Option(None, help="Stripe publishable key (pk_test_xxx)", rich_help_panel="Credentials"),
     start: int = typer.Option(None, help="Start of customer ID range (used with brute-force mode)", rich_help_panel="Brute-force Options"),
     stop: int = typer.Option(None, help="End of customer ID range (used with brute-force mode)", rich_help_panel="Brute-force Options"),
-    delay: int = typer.Option(500, help="Time delay between requests in milliseconds (default: 500ms)", rich_help_panel="Brute-force Options"),
+    rps: float = typer.Option(None, help="Maximum brute-force requests per second (default: 2, 0 disables throttling)", rich_help_panel="Brute-force Options"),
+    delay: int = typer.Option(None, help="Deprecated: time delay between requests in milliseconds (use --rps)", rich_help_panel="Brute-force Options"),
+    workers: int = typer.Option(BRUTE_FORCE_WORKERS, help=f"Concurrent brute-force requests in flight (default: {BRUTE_FORCE_WORKERS}, max: {POOL_MAXSIZE})", rich_help_panel="Brute-force Options"),
     custom_endpoint: str = typer.Option(None, help="Custom endpoint to test (used with custom mode)", rich_help_panel="Custom Options"),
-    output_folder: str = typer.Option("output", help="Folder to save results (default: output)", rich_help_panel="Output")
+    output_folder: str = typer.Option("output", help="Folder to save results (default: output)", rich_help_panel="Output"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass response caching (on-disk GET cache and in-process memo)", rich_help_panel="Output")
 ):
+    global _USE_CACHE
+
     # Display header and menu if no arguments are provided
     if len(sys.argv) == 1:
         display_header()
         display_menu()
         raise typer.Exit()
 
-    results = {}
-
-    if mode == "default":
-        if not secretkey:
-            console.print("[bold red]Error: --secretkey is required for default mode.[/bold red]")
-            raise typer.Exit()
-        console.print("Testing if the secret key can list charges...")
-        test_result = test_list_charges(secretkey)
-        results["list_charges"] = test_result
-
-    elif mode == "brute-force":
-        if not secretkey or start is None or stop is None:
-            console.print("[bold red]Error: --secretkey, --start, and --stop are required for brute-force mode.[/bold red]")
-            raise typer.Exit()
-        if start > stop:
-            console.print("[bold red]Error: --start must be less than or equal to --stop.[/bold red]")
-            raise typer.Exit()
-        console.print(f"Brute-forcing customer IDs from cus_{start:010} to cus_{stop:010} with a delay of {delay}ms...")
-        brute_force_data = brute_force_customers(secretkey, delay, start, stop)
-        results["brute_force_results"] = brute_force_data
-
-    elif mode == "pubkey":
-        if not pubkey:
-            console.print("[bold red]Error: --pubkey is required for pubkey mode.[/bold red]")
-            raise typer.Exit()
-        console.print("Testing Publishable Key by creating a test token...")
-        pubkey_result = test_publishable_key(pubkey)
-        results["test_publishable_key"] = pubkey_result
-
-    elif mode == "full":
-        if not secretkey or not pubkey:
-            console.print("[bold red]Error: --secretkey and --pubkey are required for full mode.[/bold red]")
-            raise typer.Exit()
-        console.print("Testing full validation (secret key and publishable key)...")
-        list_charges_result = test_list_charges(secretkey)
-        results["list_charges"] = list_charges_result
-        pubkey_result = test_publishable_key(pubkey)
-        results["test_publishable_key"] = pubkey_result
-
-    elif mode == "restricted":
-        if not secretkey:
-            console.print("[bold red]Error: --secretkey is required for restricted mode.[/bold red]")
-            raise typer.Exit()
-        console.print("Testing restricted key...")
-        restricted_result = test_list_charges(secretkey)
-        results["list_charges"] = restricted_result
-
-    elif mode == "custom":
-        if not secretkey or not custom_endpoint:
-            console.print("[bold red]Error: --secretkey and --custom-endpoint are required for custom mode.[/bold red]")
-            raise typer.Exit()
-        console.print(f"Testing custom endpoint {custom_endpoint}...")
-        custom_result = test_custom_endpoint(secretkey, custom_endpoint)
-        results["test_custom_endpoint"] = custom_result
+    _USE_CACHE = not no_cache
+    # One timestamp per run keeps every file written by this run consistently named
+    run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    else:
+    spec = MODES.get(mode)
+    if spec is None:
         console.print(f"[bold red]Error: Unknown mode '{mode}'. Please choose a valid mode.[/bold red]")
         raise typer.Exit()
+    args = SimpleNamespace(
+        secretkey=secretkey, pubkey=pubkey, start=start, stop=stop, rps=rps, delay=delay,
+        workers=workers, custom_endpoint=custom_endpoint,
+    )
+    if any(getattr(args, name) in (None, "") for name in spec.required):
+        console.print(f"[bold red]Error: {_join_options(spec.required)} required for {mode} mode.[/bold red]")
+        raise typer.Exit()
 
-    # Validate and save results
-    if results:
-        save_results_to_file(results, output_folder)
-    else:
-        console.print("[bold yellow]No results to save. Ensure the mode executed properly.[/bold yellow]")
-
-    # Display results if available
-    if results:
-        display_results(results)
-    else:
-        console.print("[bold yellow]No results to display.[/bold yellow]")
+    # Results are written and shown as each test completes
+    with ResultStream(output_folder, run_timestamp) as stream:
+        spec.handler(args, stream)
 
 if __name__ == "__main__":
     typer.run(main)